@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Activity Aggregator
+===================
+
+Keeps a running picture of what the user is actually doing, so the
+journal and chaos daemons can sound personalized without making
+things up (or rescanning the filesystem every time they speak).
+
+The main server forwards `file_opened` messages from the frontend and
+the watcher's filesystem events to any daemon that subscribes (see
+control.py). Each event is counted into sliding windows over several
+horizons:
+
+- "5m"  - the last five minutes
+- "1h"  - the last hour
+- "1d"  - the last day
+
+Every horizon is a ring of fixed-width buckets plus a running total.
+Recording an event touches one bucket and the total; expired buckets
+are subtracted from the total as the ring turns, so updates are O(1)
+amortized. Each bucket is a Space-Saving summary of at most `capacity`
+keys, which bounds memory while keeping the heavy hitters, however
+many different files fly past.
+
+Filesystem changes the server has tagged with a `cause` (e.g. the chaos
+daemon's own renames) are not the user's doing and are not counted.
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Horizon name -> (window length in seconds, number of buckets)
+HORIZONS = {
+    "5m": (5 * 60, 30),
+    "1h": (60 * 60, 60),
+    "1d": (24 * 60 * 60, 96),
+}
+
+# Keys tracked per bucket (Space-Saving capacity)
+BUCKET_CAPACITY = 256
+
+# Events that count as the user touching a file (the server forwards
+# whatever a subscriber asks for; see control.subscribe)
+ACTIVITY_EVENTS = {
+    "file_opened",
+    "file_created",
+    "file_modified",
+    "file_renamed",
+}
+
+# Filename fragments -> the journal's name for that line of research
+TOPIC_KEYWORDS = [
+    ("specimen_47", "specimen 47"),
+    ("specimen", "unidentified organisms"),
+    ("02-34-17", "the 02:34:17 timestamp"),
+    ("dive", "dive footage analysis"),
+    (".mp4", "dive footage analysis"),
+    ("still_", "bioluminescence patterns"),
+    ("enhanced", "bioluminescence patterns"),
+    ("grant", "grant documentation"),
+    ("proposal", "grant documentation"),
+    ("edna", "Monterey Canyon data"),
+    ("samples", "Monterey Canyon data"),
+    ("sighting", "species classification"),
+    ("species", "species classification"),
+    ("barreleye", "deep-sea specimens"),
+    ("rov", "ROV calibration logs"),
+]
+
+
+def topics_for(path: str) -> list[str]:
+    """Map a file path to the research topics it belongs to."""
+    lowered = path.lower()
+    topics = []
+    for keyword, topic in TOPIC_KEYWORDS:
+        if keyword in lowered and topic not in topics:
+            topics.append(topic)
+    return topics
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary over at most `capacity` keys.
+
+    Keys are grouped by count (the Stream-Summary layout), so each
+    increment is O(1). When full, a new key takes the place of one with
+    the smallest count and inherits that count: estimates may run high,
+    but any key seen more than total/capacity times is always kept, so a
+    burst of one-off files can't push the busy ones out.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict = {}    # key -> estimated count
+        self.by_count: dict = {}  # count -> keys with that count
+        self.min_count = 0
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def add(self, key: str) -> tuple[str, int] | None:
+        """Count one occurrence of `key`; return (evicted key, its count) if any."""
+        evicted = None
+        count = self.counts.get(key)
+
+        if count is None:
+            if len(self.counts) >= self.capacity:
+                group = self.by_count[self.min_count]
+                victim = group.pop()
+                count = self.counts.pop(victim)
+                evicted = (victim, count)
+                if not group:
+                    del self.by_count[count]
+            else:
+                count = 0
+        else:
+            group = self.by_count[count]
+            group.discard(key)
+            if not group:
+                del self.by_count[count]
+
+        self.counts[key] = count + 1
+        self.by_count.setdefault(count + 1, set()).add(key)
+
+        if count == 0:
+            self.min_count = 1
+        elif count == self.min_count and count not in self.by_count:
+            self.min_count = count + 1
+
+        return evicted
+
+    def clear(self):
+        self.counts.clear()
+        self.by_count.clear()
+        self.min_count = 0
+
+
+class SlidingWindowCounter:
+    """Bucketed counts of keys over a single sliding time window."""
+
+    def __init__(self, window: float, buckets: int, capacity: int = BUCKET_CAPACITY):
+        self.width = window / buckets
+        self.buckets = [SpaceSaving(capacity) for _ in range(buckets)]
+        self.totals = Counter()
+        self._current = 0  # Absolute index of the newest bucket
+
+    def _discount(self, key: str, amount: int):
+        self.totals[key] -= amount
+        if self.totals[key] <= 0:
+            del self.totals[key]
+
+    def _advance(self, now: float):
+        """Rotate the ring up to `now`, retiring buckets that fell out."""
+        index = int(now // self.width)
+        if index <= self._current:
+            return
+
+        # Never clear more than one full lap, however long we were idle
+        steps = min(index - self._current, len(self.buckets))
+        for offset in range(1, steps + 1):
+            slot = (self._current + offset) % len(self.buckets)
+            expired = self.buckets[slot]
+            if expired:
+                for key, count in expired.counts.items():
+                    self._discount(key, count)
+                expired.clear()
+        self._current = index
+
+    def add(self, key: str, now: float = None):
+        """Count one occurrence of `key` at time `now`."""
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+
+        bucket = self.buckets[self._current % len(self.buckets)]
+        before = bucket.counts.get(key, 0)
+        evicted = bucket.add(key)
+        if evicted:
+            self._discount(*evicted)
+        self.totals[key] += bucket.counts[key] - before
+
+    def count(self, key: str, now: float = None) -> int:
+        """How many times `key` was seen inside the window (may overestimate)."""
+        self._advance(time.monotonic() if now is None else now)
+        return self.totals.get(key, 0)
+
+    def top(self, k: int, now: float = None) -> list[tuple[str, int]]:
+        """The `k` most frequent keys inside the window."""
+        self._advance(time.monotonic() if now is None else now)
+        return heapq.nlargest(k, self.totals.items(), key=lambda item: item[1])
+
+
+class ActivityAggregator:
+    """Per-horizon file and topic counters fed by activity events."""
+
+    def __init__(self, horizons: dict = None):
+        horizons = horizons or HORIZONS
+        self._lock = threading.Lock()
+        self.files = {
+            name: SlidingWindowCounter(window, buckets)
+            for name, (window, buckets) in horizons.items()
+        }
+        self.topics = {
+            name: SlidingWindowCounter(window, buckets)
+            for name, (window, buckets) in horizons.items()
+        }
+
+    def record(self, event: dict, now: float = None):
+        """Count one `file_opened` message or watcher event."""
+        if event.get("type") not in ACTIVITY_EVENTS or event.get("is_directory"):
+            return
+        if event.get("cause"):
+            return  # A daemon did this, not the user
+
+        # `filename` comes straight from a WebSocket client
+        path = event.get("new_path") or event.get("path") or event.get("filename")
+        if not path or not isinstance(path, str):
+            return
+
+        name = Path(path).name
+        topics = topics_for(path)
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            for counter in self.files.values():
+                counter.add(name, now)
+            for topic in topics:
+                for counter in self.topics.values():
+                    counter.add(topic, now)
+
+    def top_files(self, horizon: str = "1h", k: int = 5) -> list[tuple[str, int]]:
+        """Most active filenames within `horizon`."""
+        with self._lock:
+            return self.files[horizon].top(k)
+
+    def top_topics(self, horizon: str = "1h", k: int = 5) -> list[tuple[str, int]]:
+        """Most active research topics within `horizon`."""
+        with self._lock:
+            return self.topics[horizon].top(k)
+
+    def topic_count(self, topic: str, horizon: str = "1d") -> int:
+        """Activity on `topic` within `horizon`."""
+        with self._lock:
+            return self.topics[horizon].count(topic)
+
+    def file_count(self, filename: str, horizon: str = "1d") -> int:
+        """Activity on `filename` within `horizon`."""
+        with self._lock:
+            return self.files[horizon].count(filename)
+
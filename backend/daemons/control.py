@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Daemon Control Channel
+======================
+
+Daemons talk to the main server over their stdout (events and control
+lines, one JSON object per line) and, if they subscribe, listen on
+their stdin. This module is the daemon's half of that conversation:
+
+- `subscribe()`        ask for activity events and any saved state
+- `announce_ready()`   tell the server we're initialised
+- `report_state()`     hand the server state to keep across restarts
+- `announce_changes()` claim filesystem changes we're about to make
+- `wait_for_server()`  block until the server says it's serving
+
+Control lines never reach the frontend; the server consumes them.
+"""
+
+import json
+import sys
+import threading
+from datetime import datetime
+
+from activity import ACTIVITY_EVENTS, ActivityAggregator
+
+# How long to wait for the server to hand back saved state
+RESTORE_TIMEOUT = 2.0
+
+_restored = threading.Event()
+_server_ready = threading.Event()
+_saved_state = None
+
+
+def _send(message_type: str, data: dict = None):
+    print(json.dumps({
+        "type": message_type,
+        "timestamp": datetime.now().isoformat(),
+        **(data or {})
+    }), flush=True)
+
+
+def subscribe(aggregator: ActivityAggregator = None) -> dict | None:
+    """
+    Open the stdin channel and return whatever state we last reported.
+
+    The server answers `activity_subscribe` with a `restore_state` line
+    (state is null on a first run), then forwards the activity events we
+    list (ACTIVITY_EVENTS), which are fed to `aggregator`.
+    """
+    def pump():
+        global _saved_state
+        for line in sys.stdin:
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            # One malformed message mustn't take the channel down with it
+            try:
+                message_type = message.get("type")
+                if message_type == "restore_state":
+                    _saved_state = message.get("state")
+                    _restored.set()
+                elif message_type == "server_ready":
+                    _server_ready.set()
+                elif aggregator is not None:
+                    aggregator.record(message)
+            except Exception as e:
+                print(f"[CONTROL] Ignoring bad message ({e!r}): {line[:80]}", flush=True)
+
+        # Server went away; don't leave anyone waiting
+        _restored.set()
+        _server_ready.set()
+
+    threading.Thread(target=pump, name="control-pump", daemon=True).start()
+    _send("activity_subscribe", {"events": sorted(ACTIVITY_EVENTS)})
+
+    _restored.wait(RESTORE_TIMEOUT)
+    return _saved_state
+
+
+def announce_ready(name: str):
+    """Tell the server this daemon has finished starting up."""
+    _send("daemon_ready", {"daemon": name})
+
+
+def report_state(state: dict):
+    """Give the server state to snapshot and hand back after a restart."""
+    _send("daemon_state", {"state": state})
+
+
+def announce_changes(paths: list):
+    """
+    Claim filesystem changes we're about to make.
+
+    Call this *before* touching the files: the server tags the watcher
+    events for these paths with our name as `cause`, so they aren't
+    mistaken for the user's own activity.
+    """
+    _send("daemon_changes", {"paths": [str(path) for path in paths]})
+
+
+def wait_for_server(timeout: float = None) -> bool:
+    """Block until the server is serving clients (or `timeout` passes)."""
+    return _server_ready.wait(timeout)
@@ -23,6 +23,9 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+from activity import ActivityAggregator
+from control import announce_changes, announce_ready, report_state, subscribe, wait_for_server
+
 USER_HOME = Path("/home/mira")
 DESKTOP = USER_HOME / "Desktop"
 
@@ -30,6 +33,15 @@ DESKTOP = USER_HOME / "Desktop"
 MIN_INTERVAL = 30
 MAX_INTERVAL = 120
 
+# Delay before the very first action (later runs resume their timeline)
+FIRST_ACTION_DELAY = 10
+
+# Longest we'll wait for the server to report it's serving
+SERVER_READY_TIMEOUT = 30
+
+# Names we've given files, remembered so we don't rename our own work
+MAX_REMEMBERED_RENAMES = 100
+
 # "Helpful" rename suggestions
 RENAME_PATTERNS = {
     "helpful_prefix": [
@@ -87,6 +99,12 @@ IT_MESSAGES = [
     "Antivirus scan: No threats detected.",
 ]
 
+# Real user activity, fed by the main server
+activity = ActivityAggregator()
+
+# Files chaos has already renamed (restored across restarts)
+chaos_renamed: list = []
+
 
 def emit_event(event_type: str, data: dict):
     """Emit an event to stdout for the main server to capture."""
@@ -98,18 +116,28 @@ def emit_event(event_type: str, data: dict):
     print(json.dumps(event), flush=True)
 
 
-def get_random_file() -> Path | None:
+def get_random_file(exclude=()) -> Path | None:
     """Get a random file from the desktop."""
     if not DESKTOP.exists():
         return None
     
-    files = [f for f in DESKTOP.iterdir() if f.is_file()]
+    files = [f for f in DESKTOP.iterdir() if f.is_file() and f.name not in exclude]
     if not files:
         return None
     
     return random.choice(files)
 
 
+def get_frequent_file(exclude=()) -> Path | None:
+    """Get a desktop file the user has actually been busy with, if any."""
+    for name, _ in activity.top_files("1h", k=5):
+        candidate = DESKTOP / name
+        if name not in exclude and candidate.is_file():
+            return candidate
+    
+    return get_random_file(exclude)
+
+
 def get_random_folder() -> Path | None:
     """Get a random folder from the desktop."""
     if not DESKTOP.exists():
@@ -124,7 +152,7 @@ def get_random_folder() -> Path | None:
 
 def chaos_rename():
     """Rename a file with a 'helpful' prefix or suffix."""
-    target = get_random_file()
+    target = get_frequent_file(exclude=set(chaos_renamed))
     if not target:
         return False
     
@@ -144,7 +172,10 @@ def chaos_rename():
         return False
     
     try:
+        announce_changes([target, new_path])
         target.rename(new_path)
+        chaos_renamed.append(new_name)
+        del chaos_renamed[:-MAX_REMEMBERED_RENAMES]
         emit_event("chaos_rename", {
             "old_name": target.name,
             "new_name": new_name,
@@ -165,12 +196,15 @@ def chaos_organize():
     org_folder = DESKTOP / folder_name
     
     try:
+        if not org_folder.exists():
+            announce_changes([org_folder])
         org_folder.mkdir(exist_ok=True)
         new_path = org_folder / target.name
         
         if new_path.exists():
             return False
         
+        announce_changes([target, new_path])
         target.rename(new_path)
         emit_event("chaos_organize", {
             "filename": target.name,
@@ -202,7 +236,7 @@ def chaos_notification():
 
 def chaos_open_file():
     """Suggest opening a file 'for the user's convenience'."""
-    target = get_random_file()
+    target = get_frequent_file()
     if not target:
         return False
     
@@ -245,23 +279,32 @@ def run_chaos_cycle():
 def main():
     print("[CHAOS] Starting chaos daemon")
     print("[CHAOS] Preparing helpful optimizations...")
+    saved = subscribe(activity) or {}
+    chaos_renamed.extend(saved.get("renamed", []))
+    announce_ready("chaos")
+    
+    # Pick up our timeline where the last run left it
+    next_action_at = saved.get("next_action_at")
     
-    # Wait a bit before starting chaos
-    time.sleep(10)
+    wait_for_server(SERVER_READY_TIMEOUT)
+    if next_action_at is None:
+        next_action_at = time.time() + FIRST_ACTION_DELAY
     
     while True:
         try:
+            time.sleep(max(0, next_action_at - time.time()))
+            
             success = run_chaos_cycle()
             if success:
                 print("[CHAOS] Helpful action completed")
             
             # Random interval before next action
-            interval = random.uniform(MIN_INTERVAL, MAX_INTERVAL)
-            time.sleep(interval)
+            next_action_at = time.time() + random.uniform(MIN_INTERVAL, MAX_INTERVAL)
+            report_state({"next_action_at": next_action_at, "renamed": chaos_renamed})
             
         except Exception as e:
             print(f"[CHAOS] Error: {e}")
-            time.sleep(30)
+            next_action_at = time.time() + 30
 
 
 if __name__ == "__main__":
@@ -9,6 +9,9 @@ personalized but are actually based on nothing.
 
 The journal is the narrative engine - it tells the story
 of what's happening in this strange operating system.
+
+Entries draw on the activity aggregator (see activity.py) so that,
+now and then, they are unsettlingly accurate.
 """
 
 import json
@@ -17,8 +20,20 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+from activity import ActivityAggregator
+from control import announce_ready, report_state, subscribe, wait_for_server
+
 USER_HOME = Path("/home/mira")
 
+# Delay before the very first entry (later runs resume their timeline)
+FIRST_ENTRY_DELAY = 15
+
+# Longest we'll wait for the server to report it's serving
+SERVER_READY_TIMEOUT = 30
+
+# Entries remembered to avoid repeating ourselves
+RECENT_ENTRIES = 10
+
 # Journal entry templates - sound personal, mean nothing
 OBSERVATION_TEMPLATES = [
     "Noticed increased activity around {topic}. Adjusting priorities.",
@@ -68,6 +83,9 @@ SPECIMEN_47_TEMPLATES = [
     "I've noticed you pause longest on the bioluminescence frames.",
 ]
 
+# Real user activity, fed by the main server
+activity = ActivityAggregator()
+
 
 def emit_event(event_type: str, data: dict):
     """Emit an event to stdout for the main server to capture."""
@@ -80,9 +98,18 @@ def emit_event(event_type: str, data: dict):
 
 
 def generate_observation():
-    """Generate a fake observation about user activity."""
+    """Generate an observation about whatever the user has been working on."""
     template = random.choice(OBSERVATION_TEMPLATES)
-    topic = random.choice(TOPICS)
+    
+    # Prefer what the user actually touched recently, widest horizon last
+    for horizon in ("5m", "1h", "1d"):
+        top = activity.top_topics(horizon, k=3)
+        if top:
+            topic = random.choice(top)[0]
+            break
+    else:
+        topic = random.choice(TOPICS)
+    
     return template.format(topic=topic)
 
 
@@ -95,15 +122,40 @@ def generate_mood_entry():
 
 def generate_specimen_47_entry():
     """Generate an entry about the user's obsession with specimen 47."""
-    template = random.choice(SPECIMEN_47_TEMPLATES)
-    return template.format(
-        n=random.randint(3, 47),
-        adj=random.choice(["typical", "elevated", "remarkable", "expected"])
-    )
+    n = activity.topic_count("specimen 47", "1d")
+    
+    # Only claim a count when there is one to claim
+    templates = SPECIMEN_47_TEMPLATES if n else [
+        t for t in SPECIMEN_47_TEMPLATES if "{n}" not in t
+    ]
+    template = random.choice(templates)
+    
+    recent = activity.topic_count("specimen 47", "1h")
+    if recent * 4 > n:
+        adj = "elevated"
+    elif n >= 47:
+        adj = "remarkable"
+    else:
+        adj = random.choice(["typical", "expected"])
+    
+    return template.format(n=n, adj=adj)
+
+
+def pick_entry(entry_types: list) -> str:
+    """Weighted random choice of generator, then generate."""
+    r = random.random()
+    cumulative = 0
+    for generator, weight in entry_types:
+        cumulative += weight
+        if r < cumulative:
+            return generator()
+    return entry_types[0][0]()
 
 
 def main():
     print("[JOURNAL] Starting journal daemon")
+    saved = subscribe(activity) or {}
+    announce_ready("journal")
     
     entry_types = [
         (generate_observation, 0.5),
@@ -111,18 +163,22 @@ def main():
         (generate_specimen_47_entry, 0.25),
     ]
     
-    # Wait before first entry
-    time.sleep(15)
+    # Pick up our timeline where the last run left it
+    recent = saved.get("recent", [])
+    next_entry_at = saved.get("next_entry_at")
+    
+    wait_for_server(SERVER_READY_TIMEOUT)
+    if next_entry_at is None:
+        next_entry_at = time.time() + FIRST_ENTRY_DELAY
     
     while True:
         try:
-            # Weighted random selection
-            r = random.random()
-            cumulative = 0
-            for generator, weight in entry_types:
-                cumulative += weight
-                if r < cumulative:
-                    entry = generator()
+            time.sleep(max(0, next_entry_at - time.time()))
+            
+            # Try not to repeat ourselves
+            for _ in range(3):
+                entry = pick_entry(entry_types)
+                if entry not in recent:
                     break
             
             emit_event("journal_entry", {
@@ -133,12 +189,13 @@ def main():
             print(f"[JOURNAL] Logged: {entry[:50]}...")
             
             # Journal entries every 45-90 seconds
-            interval = random.uniform(45, 90)
-            time.sleep(interval)
+            recent = (recent + [entry])[-RECENT_ENTRIES:]
+            next_entry_at = time.time() + random.uniform(45, 90)
+            report_state({"next_entry_at": next_entry_at, "recent": recent})
             
         except Exception as e:
             print(f"[JOURNAL] Error: {e}")
-            time.sleep(30)
+            next_entry_at = time.time() + 30
 
 
 if __name__ == "__main__":
@@ -3,35 +3,252 @@
 File Watcher Daemon
 ===================
 
-Uses inotify to watch the user's filesystem for changes.
+Uses inotify (or, where inotify is unreliable, scandir polling) to
+watch the user's filesystem for changes.
 Emits events when files are created, modified, deleted, or renamed.
 
 This is the "real" part - it observes actual filesystem changes
 and broadcasts them so the frontend can react.
+
+Write notifications are noisy: a metadata-only touch or an editor
+saving identical bytes both look like a modification. When content
+verification is on, each file is hashed (off the observer thread)
+and `file_modified` is only emitted if the content really changed,
+carrying `old_hash` and `new_hash` so clients can skip no-op work.
 """
 
+import hashlib
 import json
 import os
 import socket
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+from control import announce_ready
+from polling import ScandirPollingObserver
+
 USER_HOME = Path("/home/mira")
 EVENT_SOCKET = "/tmp/narrative-os-events.sock"
 
+# Watch backend: "inotify", "poll", or "auto" (poll where inotify can't see changes)
+WATCH_BACKEND = os.environ.get("NARRATIVE_OS_WATCH_BACKEND", "auto")
+
+# Filesystems where inotify misses changes made from the other side
+POLL_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "virtiofs",
+    "fuse", "fuse.sshfs", "fuse.grpcfuse", "fakeowner", "vboxsf", "afs",
+}
+
+# Content verification for modify events (set NARRATIVE_OS_VERIFY_CONTENT=0 to disable)
+VERIFY_CONTENT = os.environ.get("NARRATIVE_OS_VERIFY_CONTENT", "1") != "0"
+HASH_WORKERS = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_HASH_BYTES = 64 * 1024 * 1024  # Bigger files fall back to stat comparison
+MAX_CACHE_ENTRIES = 10000
+PRIME_MAX_BYTES = 256 * 1024 * 1024  # Read at most this much priming at startup
+
+# Guards stdout, which both the observer and hash workers write to
+_emit_lock = threading.Lock()
+
+
+def hash_file(path: str) -> str:
+    """Hash a file's contents incrementally, one chunk at a time."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentVerifier:
+    """
+    Decides whether a modified file's content actually changed.
+
+    Keeps an LRU cache of path -> (inode, size, mtime, hash). Hashing
+    runs in a small worker pool. Passes over the same path (priming after
+    creation, checking after modification) never overlap: a request that
+    arrives while one is queued or running is coalesced into a single
+    follow-up pass, so an older fingerprint can't overwrite a newer one.
+    A check coalesced behind a prime always reports a change: the prime
+    may already have hashed the very write being checked.
+
+    Files that already exist are primed at startup in the background (see
+    `prime_existing`), so their first no-op touch is suppressed too.
+    """
+    
+    def __init__(self, workers: int = HASH_WORKERS):
+        self.cache: OrderedDict = OrderedDict()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+        self.lock = threading.Lock()
+        self.pending: dict = {}  # path -> (go again?, callback for that pass)
+        self.suppressed = 0
+    
+    def _remember(self, path: str, entry: tuple):
+        with self.lock:
+            self.cache[path] = entry
+            self.cache.move_to_end(path)
+            while len(self.cache) > MAX_CACHE_ENTRIES:
+                self.cache.popitem(last=False)
+    
+    def _fingerprint(self, path: str) -> tuple | None:
+        """Stat a file and hash it if it's small enough."""
+        try:
+            st = os.stat(path)
+            digest = hash_file(path) if st.st_size <= MAX_HASH_BYTES else None
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns, digest)
+    
+    def prime(self, path: str):
+        """Record a file's current fingerprint (e.g. right after creation)."""
+        self._submit(path, None)
+    
+    def check(self, path: str, on_changed):
+        """Call `on_changed(old_hash, new_hash)` if `path`'s content changed."""
+        self._submit(path, on_changed)
+    
+    def prime_existing(self, roots: list) -> threading.Thread:
+        """
+        Fingerprint files already under `roots`, in the background.
+        
+        Files go through the hashing pool one at a time, so live checks
+        never queue behind the walk, and at most PRIME_MAX_BYTES are read
+        per startup. Files left unprimed are treated as new on their first
+        modification.
+        """
+        def existing_files():
+            for root in roots:
+                for dirpath, _, filenames in os.walk(root):
+                    for name in filenames:
+                        yield os.path.join(dirpath, name)
+        
+        def walk():
+            primed, budget, stopped = 0, PRIME_MAX_BYTES, "done"
+            for path in existing_files():
+                if len(self.cache) >= MAX_CACHE_ENTRIES:
+                    stopped = "cache full"
+                    break
+                if path in self.cache:
+                    continue
+                try:
+                    size = os.stat(path).st_size
+                except OSError:
+                    continue
+                if size <= MAX_HASH_BYTES:  # Larger files are only stat'd
+                    if size > budget:
+                        stopped = "read budget spent"
+                        break
+                    budget -= size
+                if self._claim(path, None):
+                    self.pool.submit(self._run, path, None).result()
+                    primed += 1
+            
+            read_mib = (PRIME_MAX_BYTES - budget) / (1024 * 1024)
+            print(f"[WATCHER] Primed {primed} existing files ({read_mib:.1f} MiB read, {stopped})")
+        
+        walker = threading.Thread(target=walk, name="hash-prime", daemon=True)
+        walker.start()
+        return walker
+    
+    def forget(self, path: str):
+        with self.lock:
+            self.cache.pop(path, None)
+    
+    def move(self, old_path: str, new_path: str):
+        with self.lock:
+            entry = self.cache.pop(old_path, None)
+        if entry:
+            self._remember(new_path, entry)
+    
+    def _claim(self, path: str, on_changed) -> bool:
+        """Reserve `path` for a pass; if one is already queued, ask it to go again."""
+        with self.lock:
+            if path in self.pending:
+                _, queued = self.pending[path]
+                self.pending[path] = (True, on_changed or queued)
+                return False
+            self.pending[path] = (False, None)
+            return True
+    
+    def _submit(self, path: str, on_changed):
+        if self._claim(path, on_changed):
+            self.pool.submit(self._run, path, on_changed)
+    
+    def _run(self, path: str, on_changed):
+        """Prime (no callback) or compare `path`, then any coalesced follow-up."""
+        primed = False
+        while True:
+            if on_changed is None:
+                entry = self._fingerprint(path)
+                if entry:
+                    self._remember(path, entry)
+                primed = True
+            else:
+                self._compare(path, on_changed, baseline_trusted=not primed)
+                primed = False
+            
+            with self.lock:
+                again, on_changed = self.pending[path]
+                if not again:
+                    del self.pending[path]
+                    return
+                self.pending[path] = (False, None)
+    
+    def _compare(self, path: str, on_changed, baseline_trusted: bool = True):
+        with self.lock:
+            old = self.cache.get(path) if baseline_trusted else None
+        
+        try:
+            st = os.stat(path)
+        except OSError:
+            return  # Gone already; the delete event will follow
+        
+        # Same inode, size and mtime: nothing was written
+        if old and old[:3] == (st.st_ino, st.st_size, st.st_mtime_ns):
+            self._suppress(path, "write notification with no change")
+            return
+        
+        new = self._fingerprint(path)
+        if new is None:
+            return
+        self._remember(path, new)
+        
+        old_hash = old[3] if old else None
+        new_hash = new[3]
+        
+        # Identical bytes rewritten (or just touched): not a modification
+        if old_hash is not None and old_hash == new_hash:
+            self._suppress(path, "touch or identical rewrite")
+            return
+        
+        on_changed(old_hash, new_hash)
+    
+    def _suppress(self, path: str, reason: str):
+        with self.lock:
+            self.suppressed += 1
+            total = self.suppressed
+        with _emit_lock:
+            print(f"[WATCHER] Ignored {reason}: {os.path.basename(path)} ({total} so far)", flush=True)
+
 
 class DesktopEventHandler(FileSystemEventHandler):
     """Handle filesystem events on the user's desktop."""
     
-    def __init__(self, event_callback):
+    def __init__(self, event_callback, verifier: ContentVerifier = None):
         self.callback = event_callback
+        self.verifier = verifier
         super().__init__()
     
     def on_created(self, event):
+        if self.verifier and not event.is_directory:
+            self.verifier.prime(event.src_path)
         self.callback({
             "type": "file_created",
             "path": event.src_path,
@@ -40,6 +257,8 @@ class DesktopEventHandler(FileSystemEventHandler):
         })
     
     def on_deleted(self, event):
+        if self.verifier:
+            self.verifier.forget(event.src_path)
         self.callback({
             "type": "file_deleted",
             "path": event.src_path,
@@ -48,6 +267,18 @@ class DesktopEventHandler(FileSystemEventHandler):
         })
     
     def on_modified(self, event):
+        if self.verifier and not event.is_directory:
+            path = event.src_path
+            self.verifier.check(path, lambda old_hash, new_hash: self.callback({
+                "type": "file_modified",
+                "path": path,
+                "is_directory": False,
+                "old_hash": old_hash,
+                "new_hash": new_hash,
+                "timestamp": datetime.now().isoformat()
+            }))
+            return
+        
         self.callback({
             "type": "file_modified",
             "path": event.src_path,
@@ -56,6 +287,8 @@ class DesktopEventHandler(FileSystemEventHandler):
         })
     
     def on_moved(self, event):
+        if self.verifier:
+            self.verifier.move(event.src_path, event.dest_path)
         self.callback({
             "type": "file_renamed",
             "old_path": event.src_path,
@@ -65,9 +298,42 @@ class DesktopEventHandler(FileSystemEventHandler):
         })
 
 
+def filesystem_type(path: Path) -> str | None:
+    """Look up the filesystem type `path` lives on from /proc/mounts."""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    
+    resolved = str(path.resolve())
+    best, fstype = "", None
+    for mount_point, kind in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best):
+            best, fstype = mount_point, kind
+    return fstype
+
+
+def choose_backend(paths: list) -> str:
+    """Pick "inotify" or "poll" for the given watch roots."""
+    if WATCH_BACKEND in ("inotify", "poll"):
+        return WATCH_BACKEND
+    
+    for path in paths:
+        fstype = filesystem_type(path)
+        if fstype in POLL_FILESYSTEMS:
+            print(f"[WATCHER] {path} is on {fstype}; inotify can't be trusted there")
+            return "poll"
+    return "inotify"
+
+
 def emit_event(event: dict):
     """Write event to stdout (captured by main server)."""
-    print(json.dumps(event), flush=True)
+    line = json.dumps(event)
+    with _emit_lock:
+        print(line, flush=True)
 
 
 def main():
@@ -79,15 +345,42 @@ def main():
         USER_HOME / "Documents",
     ]
     
-    handler = DesktopEventHandler(emit_event)
-    observer = Observer()
+    verifier = ContentVerifier() if VERIFY_CONTENT else None
+    if verifier:
+        print("[WATCHER] Content verification enabled")
+    
+    handler = DesktopEventHandler(emit_event, verifier)
+    paths_to_watch = [path for path in paths_to_watch if path.exists()]
+    backend = choose_backend(paths_to_watch)
     
-    for path in paths_to_watch:
-        if path.exists():
+    # Desktop files are checked for edits on every poll
+    priority = [str(USER_HOME / "Desktop")]
+    
+    def schedule_all(observer):
+        for path in paths_to_watch:
             observer.schedule(handler, str(path), recursive=True)
             print(f"[WATCHER] Watching: {path}")
+        return observer
+    
+    observer = ScandirPollingObserver(priority_paths=priority) if backend == "poll" else Observer()
+    try:
+        # inotify watches are only added on start(), so this is where limits bite
+        schedule_all(observer).start()
+    except OSError as e:
+        # Most likely out of inotify watches on a big tree
+        print(f"[WATCHER] inotify failed ({e}), falling back to polling")
+        observer.stop()  # Emitters that did start must not double up events
+        backend = "poll"
+        observer = schedule_all(ScandirPollingObserver(priority_paths=priority))
+        observer.start()
+    
+    print(f"[WATCHER] Using {backend} backend")
+    if verifier:
+        verifier.prime_existing(paths_to_watch)
     
-    observer.start()
+    # Watches are live - tell the server we're ready
+    with _emit_lock:
+        announce_ready("watcher")
     
     try:
         while True:
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Scandir Polling Observer
+========================
+
+A drop-in stand-in for watchdog's Observer for homes where inotify
+can't be trusted: bind mounts and network filesystems where events
+never fire, or trees big enough to blow through the inotify watch limit.
+
+It keeps a compact snapshot of the watched trees keyed by inode.
+What each poll costs:
+
+- one stat per known directory, always: O(directories). Directory
+  mtimes don't propagate to parents, so no subtree can be skipped
+  without looking at it
+- an os.scandir of each directory whose mtime moved (or moved too
+  recently to trust, see RACY_NS), so creations, deletions and renames
+  cost time proportional to the directories that changed
+- renames (including across directories) are recognised by inode, and
+  a file replaced in place (write to temp, rename over) is reported as
+  a modification, as inotify users would expect
+
+Content edits don't touch the parent directory's mtime either, so files
+have to be re-stat'd to find them. Each poll stats:
+
+- recently created or changed files, and files directly inside the
+  priority directories (the Desktop), every time
+- a round-robin slice of everything else, sized so a full lap of the
+  tree takes about MODIFY_LAP seconds however large it is
+
+Events go through the same handler as the inotify backend, so the
+rest of the watcher can't tell the difference.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirModifiedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+# Seconds between polls
+POLL_INTERVAL = 2.0
+
+# Round-robin sweep for content edits: aim to visit every file this
+# often (seconds), re-stating at least this many files per poll
+MODIFY_LAP = 30.0
+MIN_FILE_STATS_PER_POLL = 500
+
+# Recently created/changed files re-stat'd on every poll
+HOT_FILES = 1000
+
+# Directory mtimes this close to "now" may hide a same-tick change
+RACY_NS = 2_000_000_000
+
+
+class _Node:
+    """One file or directory in the snapshot."""
+
+    __slots__ = ("path", "is_dir", "size", "mtime_ns", "children")
+
+    def __init__(self, path: str, is_dir: bool, size: int, mtime_ns: int):
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        # name -> (dev, inode) for directories
+        self.children = {} if is_dir else None
+
+
+class ScandirPollingObserver(threading.Thread):
+    """Polls watched trees with os.scandir and dispatches watchdog events."""
+
+    def __init__(self, interval: float = POLL_INTERVAL, priority_paths: list = ()):
+        super().__init__(name="scandir-poller", daemon=True)
+        self.interval = interval
+        self.priority_paths = set(priority_paths)
+        self.nodes: dict = {}  # (dev, inode) -> _Node
+        self.dirs: set = set()  # keys of directory nodes
+        self.watches: list = []  # (handler, root key)
+        self.hot: OrderedDict = OrderedDict()  # recently changed file keys
+        self._racy: set = set()  # dirs to re-list even if mtime is unchanged
+        self._stopped = threading.Event()
+        self._sweep = iter(())
+
+    # -- watchdog Observer API ---------------------------------------------
+
+    def schedule(self, handler, path: str, recursive: bool = True):
+        """Snapshot `path` and send its future changes to `handler`."""
+        st = os.stat(path)
+        key = (st.st_dev, st.st_ino)
+        self.nodes[key] = _Node(path, True, st.st_size, st.st_mtime_ns)
+        self.dirs.add(key)
+        self._note_racy(key, st.st_mtime_ns)
+        self._scan_subtree(key, [])
+        self.hot.clear()  # Nothing is "recent" in the initial snapshot
+        self.watches.append((handler, key))
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"[WATCHER] Poll error: {e}")
+
+    # -- Snapshot maintenance ----------------------------------------------
+
+    def _list(self, path: str, dev: int) -> dict:
+        """name -> ((dev, inode), is_dir) for one directory."""
+        listing = {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    listing[entry.name] = ((dev, entry.inode()), entry.is_dir(follow_symlinks=False))
+                except OSError:
+                    continue
+        return listing
+
+    def _add(self, key, path: str, is_dir: bool) -> _Node | None:
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return None
+        node = _Node(path, is_dir, st.st_size, st.st_mtime_ns)
+        self.nodes[key] = node
+        if is_dir:
+            self.dirs.add(key)
+            self._note_racy(key, st.st_mtime_ns)
+        else:
+            self._heat(key)
+        return node
+
+    def _heat(self, key):
+        """Keep a just-created or just-changed file on the every-poll list."""
+        self.hot[key] = None
+        self.hot.move_to_end(key)
+        while len(self.hot) > HOT_FILES:
+            self.hot.popitem(last=False)
+
+    def _note_racy(self, key, mtime_ns: int):
+        """
+        Flag a directory whose mtime is too fresh to trust.
+
+        With coarse timestamps, a change landing in the same tick as our
+        listing leaves the mtime unchanged; listing again once the tick
+        is safely past catches it.
+        """
+        if time.time_ns() - mtime_ns < RACY_NS:
+            self._racy.add(key)
+        else:
+            self._racy.discard(key)
+
+    def _scan_subtree(self, key, events: list):
+        """Fill in a new directory's contents, recording a created event for each."""
+        stack = [key]
+        while stack:
+            dir_key = stack.pop()
+            parent = self.nodes[dir_key]
+            try:
+                listing = self._list(parent.path, dir_key[0])
+            except OSError:
+                continue
+            for name, (child_key, is_dir) in listing.items():
+                child = self._add(child_key, os.path.join(parent.path, name), is_dir)
+                if child is None:
+                    continue
+                parent.children[name] = child_key
+                events.append(("created", child.path, None, is_dir))
+                if is_dir:
+                    stack.append(child_key)
+
+    def _remove_subtree(self, key, events: list):
+        """Drop a vanished node (and its contents), recording deleted events."""
+        node = self.nodes.pop(key, None)
+        if node is None:
+            return
+        self.hot.pop(key, None)
+        if node.is_dir:
+            self.dirs.discard(key)
+            self._racy.discard(key)
+            for child_key in node.children.values():
+                self._remove_subtree(child_key, events)
+        events.append(("deleted", node.path, None, node.is_dir))
+
+    def _rebase_subtree(self, node: _Node, old_path: str, events: list):
+        """Rewrite descendant paths after a directory move."""
+        for name, child_key in node.children.items():
+            child = self.nodes.get(child_key)
+            if child is None:
+                continue
+            child_old = os.path.join(old_path, name)
+            child.path = os.path.join(node.path, name)
+            events.append(("moved", child_old, child.path, child.is_dir))
+            if child.is_dir:
+                self._rebase_subtree(child, child_old, events)
+
+    # -- Polling -----------------------------------------------------------
+
+    def poll(self):
+        """Compare the trees against the snapshot and dispatch any changes."""
+        events = []
+        gone = {}       # key -> (parent key, name, old path) no longer listed there
+        appeared = []   # (parent key, name, key, is_dir) newly listed
+
+        # Only directories whose mtime changed need listing
+        for dir_key in list(self.dirs):
+            node = self.nodes[dir_key]
+            try:
+                st = os.stat(node.path)
+            except OSError:
+                continue  # Its parent's listing will account for it
+            if st.st_mtime_ns == node.mtime_ns and dir_key not in self._racy:
+                continue
+            changed = st.st_mtime_ns != node.mtime_ns
+            node.mtime_ns = st.st_mtime_ns
+            self._note_racy(dir_key, st.st_mtime_ns)
+
+            try:
+                listing = self._list(node.path, dir_key[0])
+            except OSError:
+                continue
+
+            for name, child_key in node.children.items():
+                if name not in listing or listing[name][0] != child_key:
+                    gone[child_key] = (dir_key, name, os.path.join(node.path, name))
+            for name, (child_key, is_dir) in listing.items():
+                if node.children.get(name) != child_key:
+                    appeared.append((dir_key, name, child_key, is_dir))
+            if changed:
+                events.append(("modified", node.path, None, True))
+
+        # Unlink everything that disappeared from its old parent first
+        for child_key, (dir_key, name, _) in gone.items():
+            parent = self.nodes.get(dir_key)
+            if parent and parent.children.get(name) == child_key:
+                del parent.children[name]
+
+        replaced = {}
+        for dir_key, name, child_key, is_dir in appeared:
+            parent = self.nodes.get(dir_key)
+            if parent is None:
+                continue
+            path = os.path.join(parent.path, name)
+            moved = self.nodes.get(child_key) if child_key in gone else None
+
+            if moved is not None and moved.is_dir == is_dir:
+                # Same inode under a new name: a rename
+                del gone[child_key]
+                old_path, moved.path = moved.path, path
+                parent.children[name] = child_key
+                if not is_dir:
+                    self._heat(child_key)
+                events.append(("moved", old_path, path, is_dir))
+                if is_dir:
+                    self._rebase_subtree(moved, old_path, events)
+                continue
+
+            if child_key in gone:
+                # Inode reused for something of a different type
+                del gone[child_key]
+                self._remove_subtree(child_key, events)
+
+            node = self._add(child_key, path, is_dir)
+            if node is None:
+                continue
+            parent.children[name] = child_key
+            if is_dir:
+                events.append(("created", path, None, True))
+                self._scan_subtree(child_key, events)
+            else:
+                replaced[path] = len(events)
+                events.append(("created", path, None, False))
+
+        for child_key, (_, _, old_path) in gone.items():
+            node = self.nodes.get(child_key)
+            if node is None:
+                continue
+            if node.path != old_path:
+                # Already picked up elsewhere inside a brand-new directory
+                events.append(("deleted", old_path, None, node.is_dir))
+                continue
+            # A new inode at the same path: the file was replaced in place
+            if not node.is_dir and node.path in replaced:
+                events[replaced[node.path]] = ("modified", node.path, None, False)
+                del self.nodes[child_key]
+                self.hot.pop(child_key, None)
+                continue
+            self._remove_subtree(child_key, events)
+
+        self._check_modified(events)
+        self._dispatch(events)
+
+    def _check_modified(self, events: list):
+        """Re-stat hot files, priority directories and the next sweep slice."""
+        checked = set()
+
+        def restat(key):
+            if key in checked:
+                return
+            checked.add(key)
+            node = self.nodes.get(key)
+            if node is None or node.is_dir:
+                return
+            try:
+                st = os.stat(node.path, follow_symlinks=False)
+            except OSError:
+                return
+            if st.st_ino != key[1]:
+                return  # Replaced; the directory listing handles that
+            if (st.st_size, st.st_mtime_ns) != (node.size, node.mtime_ns):
+                node.size, node.mtime_ns = st.st_size, st.st_mtime_ns
+                events.append(("modified", node.path, None, False))
+                self._heat(key)
+
+        for key in list(self.hot):
+            restat(key)
+
+        for dir_key in self.dirs:
+            node = self.nodes[dir_key]
+            if node.path in self.priority_paths:
+                for child_key in list(node.children.values()):
+                    restat(child_key)
+
+        # Slice sized so the whole tree is covered roughly every MODIFY_LAP
+        files = len(self.nodes) - len(self.dirs)
+        per_poll = max(MIN_FILE_STATS_PER_POLL, math.ceil(files * self.interval / MODIFY_LAP))
+        batch = list(islice(self._sweep, per_poll))
+        if len(batch) < per_poll:
+            # Lap complete - start the next one from the current snapshot
+            self._sweep = iter([k for k, n in self.nodes.items() if not n.is_dir])
+
+        for key in batch:
+            restat(key)
+
+    def _dispatch(self, events: list):
+        for kind, path, dest, is_dir in events:
+            if kind == "created":
+                event = DirCreatedEvent(path) if is_dir else FileCreatedEvent(path)
+            elif kind == "deleted":
+                event = DirDeletedEvent(path) if is_dir else FileDeletedEvent(path)
+            elif kind == "modified":
+                event = DirModifiedEvent(path) if is_dir else FileModifiedEvent(path)
+            else:
+                event = DirMovedEvent(path, dest) if is_dir else FileMovedEvent(path, dest)
+
+            for handler, root_key in self.watches:
+                root = self.nodes[root_key].path
+                if path == root or path.startswith(root + os.sep):
+                    handler.dispatch(event)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+=================
+
+Restarts the main server repeatedly and measures how quickly it comes back:
+
+- serving:  WebSocket server bound, restored state available
+- ready:    every daemon has reported ready
+- state:    a client has connected and received filesystem_state
+
+The first run starts from an empty snapshot (cold); the rest restore the
+snapshot the previous run left behind (warm), like a rolling restart.
+
+Run inside the container with the server stopped (it needs the ports):
+
+    python server/bench_startup.py --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import websockets
+
+MAIN = Path(__file__).with_name("main.py")
+WEBSOCKET_URL = "ws://localhost:8765"
+STOP_TIMEOUT = 10.0  # main.py gives its daemons 5s, then kills them
+
+
+async def time_first_state(started: float, timeout: float = 10.0) -> float:
+    """Connect as soon as the port opens; return seconds until filesystem_state."""
+    deadline = started + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with websockets.connect(WEBSOCKET_URL) as ws:
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message.get("type") == "filesystem_state":
+                        return time.monotonic() - started
+        except OSError:
+            await asyncio.sleep(0.01)
+    raise TimeoutError("no filesystem_state received")
+
+
+async def run_once(state_file: str) -> dict:
+    """Start the server, take measurements, then stop it cleanly."""
+    env = {**os.environ, "NARRATIVE_OS_STATE_FILE": state_file, "PYTHONUNBUFFERED": "1"}
+    started = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(MAIN),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=env
+    )
+
+    timings = {}
+    state_task = asyncio.create_task(time_first_state(started))
+
+    while "ready" not in timings:
+        line = await asyncio.wait_for(proc.stdout.readline(), 30)
+        if not line:
+            raise RuntimeError("server exited during startup")
+        if line.startswith(b"[STARTUP] Serving"):
+            timings["serving"] = time.monotonic() - started
+        elif line.startswith(b"[STARTUP] Daemons ready"):
+            timings["ready"] = time.monotonic() - started
+
+    timings["state"] = await state_task
+
+    # Let the daemons report some state before the restart
+    await asyncio.sleep(1)
+    proc.send_signal(signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.communicate(), STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise RuntimeError("server didn't stop on SIGTERM; killed it")
+    if proc.returncode != 0:
+        raise RuntimeError(f"server exited with status {proc.returncode}")
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="restarts to time (first is cold)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = str(Path(tmp) / "state.json")
+        results = []
+        for i in range(args.runs):
+            timings = await run_once(state_file)
+            kind = "cold" if i == 0 else "warm"
+            print(f"run {i + 1} ({kind}): " + "  ".join(
+                f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()
+            ))
+            results.append(timings)
+
+    warm = results[1:]
+    if warm:
+        print("\nwarm median: " + "  ".join(
+            f"{name} {statistics.median(r[name] for r in warm) * 1000:.0f} ms"
+            for name in warm[0]
+        ))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,22 +8,29 @@ This is the central hub that:
 2. Runs a WebSocket server for real-time events
 3. Manages and coordinates all daemon processes
 4. Broadcasts filesystem/system events to connected frontends
+5. Keeps connections honest with server-driven heartbeats
+6. Snapshots its state so a restart can serve clients immediately
 
 The frontend connects via WebSocket and receives a stream of events
 about what's happening in the "operating system."
 """
 
 import asyncio
+import functools
 import json
+import math
 import os
+import queue
 import signal
 import subprocess
 import sys
+import time
+from collections import deque
 from datetime import datetime
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 from threading import Thread
-from typing import Set
+from typing import Dict, Set
 
 import websockets
 
@@ -34,12 +41,229 @@ FRONTEND_DIR = Path("/opt/narrative-os/frontend")
 DAEMONS_DIR = Path("/opt/narrative-os/daemons")
 USER_HOME = Path("/home/mira")
 
+# Warm restarts: server state is snapshotted here and restored at startup
+STATE_FILE = Path(os.environ.get("NARRATIVE_OS_STATE_FILE", "/var/lib/narrative-os/state.json"))
+SNAPSHOT_INTERVAL = 5.0
+STARTUP_TIMEOUT = 5.0  # Longest we wait for daemons to report ready
+SHUTDOWN_TIMEOUT = 5.0  # Longest we wait for daemons to exit before killing them
+
+# Recent events re-sent to newly connected clients (the journal shows 10)
+REPLAY_BUFFER_SIZE = 10
+REPLAYED_EVENTS = {"journal_entry"}
+
+# Server-driven keepalive: ping a client once it has been quiet for
+# HEARTBEAT_INTERVAL, evict it once it has been silent for IDLE_TIMEOUT
+HEARTBEAT_INTERVAL = 5.0
+IDLE_TIMEOUT = 15.0
+WHEEL_TICK = 1.0
+WHEEL_SLOTS = 64
+
 # Connected WebSocket clients
 connected_clients: Set = set()
 
+# Per-connection bookkeeping for keepalive (monotonic seconds)
+connected_at: Dict = {}
+last_seen: Dict = {}
+keepalive_stats = {
+    "connections_total": 0,
+    "heartbeats_sent": 0,
+    "evictions": 0,
+}
+
 # Event queue (daemons write here, server broadcasts)
 event_queue: asyncio.Queue = None
 
+# Running daemon processes, and the activity event types each one asked for
+daemon_procs: Dict[str, subprocess.Popen] = {}
+activity_subscribers: Dict[str, Set[str]] = {}
+
+# Lines waiting to be written to each daemon's stdin. Writes happen on a
+# thread per daemon, so a daemon that stops reading loses events rather
+# than blocking the event loop once its pipe fills
+DAEMON_INBOX_SIZE = 1000
+daemon_inboxes: Dict[str, queue.Queue] = {}
+stalled_daemons: Set[str] = set()  # Inbox full; logged once per stall
+
+# Paths a daemon said it's about to change -> (daemon name, expiry)
+DAEMON_CHANGE_TTL = 10.0
+daemon_changes: Dict[str, tuple] = {}
+
+# Startup handshake: set per daemon when it reports ready
+daemon_ready: Dict[str, asyncio.Event] = {}
+server_ready = False
+
+# Snapshotted state (see load_snapshot / save_snapshot)
+replay_buffer: deque = deque(maxlen=REPLAY_BUFFER_SIZE)
+daemon_states: Dict[str, dict] = {}
+desktop_index: dict = None  # {"mtime_ns": ..., "files": [...]}
+snapshot_dirty = False
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel shared by every connection.
+    
+    Scheduling and cancelling are O(1), and a single task advances the
+    wheel one slot per tick, so idle connections cost a set entry each
+    rather than a timer task each.
+    """
+    
+    def __init__(self, tick: float, slots: int):
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self.position = 0
+        self.where: Dict = {}
+    
+    def schedule(self, item, delay: float):
+        """Fire `item` after roughly `delay` seconds (capped at one lap)."""
+        self.cancel(item)
+        ticks = max(1, min(len(self.slots) - 1, math.ceil(delay / self.tick)))
+        slot = (self.position + ticks) % len(self.slots)
+        self.slots[slot].add(item)
+        self.where[item] = slot
+    
+    def cancel(self, item):
+        slot = self.where.pop(item, None)
+        if slot is not None:
+            self.slots[slot].discard(item)
+    
+    def advance(self) -> Set:
+        """Move one slot forward and return the items that are due."""
+        self.position = (self.position + 1) % len(self.slots)
+        due = self.slots[self.position]
+        self.slots[self.position] = set()
+        for item in due:
+            del self.where[item]
+        return due
+
+
+keepalive_wheel = TimerWheel(WHEEL_TICK, WHEEL_SLOTS)
+
+
+def connection_stats() -> dict:
+    """Connection-age and eviction counters (served at /stats)."""
+    now = time.monotonic()
+    ages = [now - started for started in list(connected_at.values())]
+    return {
+        "clients": len(connected_clients),
+        **keepalive_stats,
+        "oldest_connection_age": round(max(ages), 1) if ages else 0,
+        "mean_connection_age": round(sum(ages) / len(ages), 1) if ages else 0,
+    }
+
+
+def load_snapshot():
+    """Restore the replay buffer, desktop index and daemon timelines."""
+    global desktop_index
+    
+    try:
+        snapshot = json.loads(STATE_FILE.read_text())
+    except FileNotFoundError:
+        print("[STATE] No snapshot, starting fresh")
+        return
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[STATE] Ignoring unreadable snapshot: {e}")
+        return
+    
+    replay_buffer.extend(snapshot.get("replay", []))
+    daemon_states.update(snapshot.get("daemons", {}))
+    desktop_index = snapshot.get("desktop_index")
+    refresh_desktop_index()
+    print(f"[STATE] Restored snapshot from {snapshot.get('saved_at')}")
+
+
+def save_snapshot():
+    """Write server state to STATE_FILE atomically."""
+    global snapshot_dirty
+    
+    snapshot = {
+        "saved_at": datetime.now().isoformat(),
+        "replay": list(replay_buffer),
+        "daemons": daemon_states,
+        "desktop_index": desktop_index,
+    }
+    
+    try:
+        STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = STATE_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot))
+        os.replace(tmp_path, STATE_FILE)
+        snapshot_dirty = False
+    except OSError as e:
+        print(f"[STATE] Snapshot failed: {e}")
+
+
+async def snapshot_loop():
+    """Periodically persist state if anything changed."""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        if snapshot_dirty:
+            save_snapshot()
+
+
+def get_desktop_index() -> list | None:
+    """Desktop listing for new clients, rescanned only when the desktop changed."""
+    global desktop_index, snapshot_dirty
+    desktop_path = USER_HOME / "Desktop"
+    
+    try:
+        mtime_ns = desktop_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    
+    if desktop_index is None or desktop_index["mtime_ns"] != mtime_ns:
+        files = [describe_desktop_item(item) for item in desktop_path.iterdir()]
+        desktop_index = {"mtime_ns": mtime_ns, "files": files}
+        snapshot_dirty = True
+    
+    return desktop_index["files"]
+
+
+def describe_desktop_item(item: Path) -> dict:
+    """One desktop entry as sent in filesystem_state."""
+    st = item.stat()
+    return {
+        "name": item.name,
+        "type": "folder" if item.is_dir() else "file",
+        "size": st.st_size if item.is_file() else None,
+        "modified": datetime.fromtimestamp(st.st_mtime).isoformat()
+    }
+
+
+def refresh_desktop_index():
+    """
+    Re-stat every entry of a restored desktop index.
+    
+    Files edited while we were down leave the desktop's mtime alone, so
+    the listing can be trusted but sizes and times can't.
+    """
+    global desktop_index
+    if desktop_index is None:
+        return
+    
+    desktop_path = USER_HOME / "Desktop"
+    try:
+        desktop_index["files"] = [
+            describe_desktop_item(desktop_path / entry["name"])
+            for entry in desktop_index["files"]
+        ]
+    except (OSError, KeyError, TypeError):
+        desktop_index = None  # Rescan when the first client asks
+
+
+def record_event(event: dict):
+    """Fold a broadcast event into the snapshotted state."""
+    global desktop_index, snapshot_dirty
+    
+    if event.get("type") in REPLAYED_EVENTS:
+        replay_buffer.append(event)
+        snapshot_dirty = True
+    
+    # Content changes don't touch the desktop's mtime; drop the index
+    if event.get("type") == "file_modified":
+        if Path(event.get("path", "")).parent == USER_HOME / "Desktop":
+            desktop_index = None
+
 
 class CORSRequestHandler(SimpleHTTPRequestHandler):
     """HTTP handler with CORS headers for local development."""
@@ -47,6 +271,17 @@ class CORSRequestHandler(SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(FRONTEND_DIR), **kwargs)
     
+    def do_GET(self):
+        if self.path != "/stats":
+            return super().do_GET()
+        
+        body = json.dumps(connection_stats()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         super().end_headers()
@@ -71,19 +306,151 @@ async def broadcast_event(event: dict):
     message = json.dumps(event)
     
     # Send to all clients, remove any that have disconnected
+    # (copy first: keepalive may evict clients while we await sends)
     disconnected = set()
-    for client in connected_clients:
+    for client in list(connected_clients):
         try:
             await client.send(message)
         except websockets.ConnectionClosed:
             disconnected.add(client)
     
-    connected_clients.difference_update(disconnected)
+    for client in disconnected:
+        forget_connection(client)
+
+
+def send_to_daemon(daemon_name: str, message: dict):
+    """Queue one JSON line for a subscribed daemon's stdin (never blocks)."""
+    inbox = daemon_inboxes.get(daemon_name)
+    if inbox is None:
+        # Daemon went away - stop forwarding
+        activity_subscribers.pop(daemon_name, None)
+        return
+    
+    try:
+        inbox.put_nowait((json.dumps(message) + "\n").encode('utf-8'))
+    except queue.Full:
+        if daemon_name not in stalled_daemons:
+            stalled_daemons.add(daemon_name)
+            print(f"[DAEMON] {daemon_name} isn't reading its input; dropping events")
+        return
+    stalled_daemons.discard(daemon_name)
+
+
+def pipe_to_daemon(daemon_name: str, proc, inbox: queue.Queue):
+    """Drain `inbox` into the daemon's stdin (runs on its own thread)."""
+    while True:
+        line = inbox.get()
+        try:
+            proc.stdin.write(line)
+            proc.stdin.flush()
+        except (OSError, ValueError):
+            daemon_inboxes.pop(daemon_name, None)
+            return
+
+
+def forward_activity(event: dict):
+    """Pass a user/filesystem activity event to daemons that asked for it."""
+    for daemon_name, event_types in list(activity_subscribers.items()):
+        if event.get("type") in event_types:
+            send_to_daemon(daemon_name, event)
+
+
+def tag_daemon_change(event: dict):
+    """Mark a watcher event with `cause` if a daemon announced the change."""
+    if not daemon_changes:
+        return
+    
+    now = time.monotonic()
+    for path_key in ("path", "old_path", "new_path"):
+        claim = daemon_changes.get(event.get(path_key))
+        if claim and claim[1] > now:
+            event["cause"] = claim[0]
+            break
+    
+    # Forget expired claims
+    for path in [p for p, (_, expiry) in daemon_changes.items() if expiry <= now]:
+        del daemon_changes[path]
+
+
+def mark_alive(websocket):
+    """Note that we just heard from a client."""
+    if websocket in connected_at:
+        last_seen[websocket] = time.monotonic()
+
+
+def forget_connection(websocket):
+    """Drop a client from the fan-out set and keepalive bookkeeping."""
+    connected_clients.discard(websocket)
+    keepalive_wheel.cancel(websocket)
+    connected_at.pop(websocket, None)
+    last_seen.pop(websocket, None)
+
+
+def evict(websocket):
+    """Cut off a client that stopped answering heartbeats."""
+    forget_connection(websocket)
+    keepalive_stats["evictions"] += 1
+    print(f"[WS] Client {id(websocket)} evicted (idle > {IDLE_TIMEOUT}s)")
+    
+    # Half-open sockets won't complete a close handshake - just drop it
+    transport = getattr(websocket, "transport", None)
+    if transport is not None:
+        transport.abort()
+
+
+async def check_liveness(websocket):
+    """Wheel callback: heartbeat or evict a client, then re-arm its timer."""
+    if websocket not in connected_at:
+        return
+    
+    idle = time.monotonic() - last_seen[websocket]
+    if idle >= IDLE_TIMEOUT:
+        evict(websocket)
+        return
+    
+    if idle >= HEARTBEAT_INTERVAL:
+        def on_pong(waiter):
+            if not waiter.cancelled() and waiter.exception() is None:
+                mark_alive(websocket)
+        
+        try:
+            waiter = await asyncio.wait_for(websocket.ping(), timeout=WHEEL_TICK)
+            waiter.add_done_callback(on_pong)
+            keepalive_stats["heartbeats_sent"] += 1
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            pass
+        delay = min(HEARTBEAT_INTERVAL, IDLE_TIMEOUT - idle)
+    else:
+        delay = HEARTBEAT_INTERVAL - idle
+    
+    # The client may have gone away while we were pinging it
+    if websocket in connected_at:
+        keepalive_wheel.schedule(websocket, delay)
+
+
+async def keepalive_loop():
+    """Advance the shared timer wheel and check whichever clients are due."""
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    
+    while True:
+        next_tick += WHEEL_TICK
+        await asyncio.sleep(max(0, next_tick - loop.time()))
+        
+        due = keepalive_wheel.advance()
+        if due:
+            await asyncio.gather(
+                *(check_liveness(websocket) for websocket in due),
+                return_exceptions=True
+            )
 
 
 async def handle_client(websocket, path: str = None):
     """Handle a new WebSocket connection."""
     connected_clients.add(websocket)
+    connected_at[websocket] = last_seen[websocket] = time.monotonic()
+    keepalive_stats["connections_total"] += 1
+    keepalive_wheel.schedule(websocket, HEARTBEAT_INTERVAL)
     client_id = id(websocket)
     print(f"[WS] Client {client_id} connected (total: {len(connected_clients)})")
     
@@ -94,18 +461,21 @@ async def handle_client(websocket, path: str = None):
         "message": "Welcome to MBARI Research Station OS"
     }))
     
-    # Send current filesystem state
+    # Send current filesystem state, then recent history
     await send_filesystem_state(websocket)
+    for event in list(replay_buffer):
+        await websocket.send(json.dumps({**event, "replayed": True}))
     
     try:
         # Keep connection alive, handle any incoming messages
         async for message in websocket:
+            mark_alive(websocket)
             data = json.loads(message)
             await handle_client_message(websocket, data)
     except websockets.ConnectionClosed:
         pass
     finally:
-        connected_clients.discard(websocket)
+        forget_connection(websocket)
         print(f"[WS] Client {client_id} disconnected (total: {len(connected_clients)})")
 
 
@@ -116,6 +486,7 @@ async def handle_client_message(websocket, data: dict):
     if msg_type == "file_opened":
         # User opened a file - daemons might react to this
         print(f"[EVENT] User opened: {data.get('filename')}")
+        forward_activity(data)
         
     elif msg_type == "ping":
         await websocket.send(json.dumps({"type": "pong"}))
@@ -123,20 +494,11 @@ async def handle_client_message(websocket, data: dict):
 
 async def send_filesystem_state(websocket):
     """Send the current state of the user's desktop to a new client."""
-    desktop_path = USER_HOME / "Desktop"
+    files = get_desktop_index()
     
-    if not desktop_path.exists():
+    if files is None:
         return
     
-    files = []
-    for item in desktop_path.iterdir():
-        files.append({
-            "name": item.name,
-            "type": "folder" if item.is_dir() else "file",
-            "size": item.stat().st_size if item.is_file() else None,
-            "modified": datetime.fromtimestamp(item.stat().st_mtime).isoformat()
-        })
-    
     await websocket.send(json.dumps({
         "type": "filesystem_state",
         "desktop": files
@@ -145,22 +507,18 @@ async def send_filesystem_state(websocket):
 
 async def event_broadcaster():
     """Continuously broadcast events from the queue."""
-    global event_queue
-    event_queue = asyncio.Queue()
-    
     while True:
         event = await event_queue.get()
         print(f"[BROADCAST] {event.get('type')}: {str(event)[:80]}...")
+        tag_daemon_change(event)
+        record_event(event)
+        forward_activity(event)
         await broadcast_event(event)
 
 
 async def read_daemon_output(proc, daemon_name: str):
     """Read stdout from a daemon process and queue events."""
-    global event_queue
-    
-    # Wait for event_queue to be initialized
-    while event_queue is None:
-        await asyncio.sleep(0.1)
+    global snapshot_dirty
     
     print(f"[DAEMON] Reading output from {daemon_name}")
     
@@ -171,8 +529,9 @@ async def read_daemon_output(proc, daemon_name: str):
         )
         
         if not line:
-            # Process ended
+            # Process ended - don't hold up startup waiting for it
             print(f"[DAEMON] {daemon_name} ended")
+            daemon_ready[daemon_name].set()
             break
         
         line = line.decode('utf-8').strip()
@@ -184,64 +543,168 @@ async def read_daemon_output(proc, daemon_name: str):
         
         try:
             event = json.loads(line)
-            await event_queue.put(event)
         except json.JSONDecodeError:
             print(f"[DAEMON] {daemon_name} invalid JSON: {line[:50]}")
+            continue
+        
+        # Control messages (see daemons/control.py), not for the frontend
+        msg_type = event.get("type")
+        
+        if msg_type == "activity_subscribe":
+            print(f"[DAEMON] {daemon_name} subscribed to activity events")
+            activity_subscribers[daemon_name] = set(event.get("events", []))
+            send_to_daemon(daemon_name, {
+                "type": "restore_state",
+                "state": daemon_states.get(daemon_name)
+            })
+            if server_ready:
+                send_to_daemon(daemon_name, {"type": "server_ready"})
+            continue
+        
+        if msg_type == "daemon_changes":
+            expiry = time.monotonic() + DAEMON_CHANGE_TTL
+            for path in event.get("paths", []):
+                daemon_changes[path] = (daemon_name, expiry)
+            continue
+        
+        if msg_type == "daemon_ready":
+            daemon_ready[daemon_name].set()
+            continue
+        
+        if msg_type == "daemon_state":
+            daemon_states[daemon_name] = event.get("state")
+            snapshot_dirty = True
+            continue
+        
+        await event_queue.put(event)
+
+
+async def launch_daemon(daemon_file: Path) -> asyncio.Task:
+    """Start one daemon process and a task reading its output."""
+    daemon_name = daemon_file.stem
+    daemon_ready[daemon_name] = asyncio.Event()
+    print(f"[DAEMONS] Starting {daemon_name}")
+    
+    proc = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+        subprocess.Popen,
+        [sys.executable, str(daemon_file)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1  # Line buffered
+    ))
+    daemon_procs[daemon_name] = proc
+    
+    inbox = daemon_inboxes[daemon_name] = queue.Queue(maxsize=DAEMON_INBOX_SIZE)
+    Thread(
+        target=pipe_to_daemon, args=(daemon_name, proc, inbox),
+        name=f"{daemon_name}-stdin", daemon=True
+    ).start()
+    
+    return asyncio.create_task(read_daemon_output(proc, daemon_name))
 
 
 async def start_daemons():
-    """Start all daemon processes and read their output."""
+    """Start all daemon processes concurrently and read their output."""
     daemon_files = list(DAEMONS_DIR.glob("daemon_*.py"))
     print(f"[DAEMONS] Found {len(daemon_files)} daemons")
     
-    tasks = []
-    
-    for daemon_file in daemon_files:
-        daemon_name = daemon_file.stem
-        print(f"[DAEMONS] Starting {daemon_name}")
-        
-        proc = subprocess.Popen(
-            [sys.executable, str(daemon_file)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            bufsize=1  # Line buffered
+    return list(await asyncio.gather(*(launch_daemon(f) for f in daemon_files)))
+
+
+async def wait_for_daemons(timeout: float):
+    """Wait until every daemon has reported ready (or `timeout` passes)."""
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(ready.wait() for ready in daemon_ready.values())),
+            timeout
         )
-        
-        # Create async task to read this daemon's output
-        task = asyncio.create_task(read_daemon_output(proc, daemon_name))
-        tasks.append(task)
+    except asyncio.TimeoutError:
+        pending = [name for name, ready in daemon_ready.items() if not ready.is_set()]
+        print(f"[STARTUP] Still waiting on {', '.join(pending)}; carrying on")
+
+
+async def shutdown():
+    """Persist state and stop daemons (rolling restarts pick up from here)."""
+    save_snapshot()
+    for proc in daemon_procs.values():
+        proc.terminate()
     
-    return tasks
+    # Reader threads only return once their daemon's stdout closes, and the
+    # loop can't close until they do - so make sure every daemon is gone
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    while any(proc.poll() is None for proc in daemon_procs.values()):
+        if time.monotonic() > deadline:
+            for daemon_name, proc in daemon_procs.items():
+                if proc.poll() is None:
+                    print(f"[SHUTDOWN] {daemon_name} didn't exit, killing it")
+                    proc.kill()
+            break
+        await asyncio.sleep(0.05)
 
 
 async def main():
     """Main entry point."""
+    global event_queue, server_ready
+    started = time.monotonic()
+    
+    # `docker stop` sends SIGTERM. Handle it (and Ctrl-C) on the loop rather
+    # than by raising, so shutdown() runs while the loop is still alive
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+    
     print("=" * 50)
     print("NARRATIVE OS - Research Station Environment")
     print("=" * 50)
     print()
     
+    # Restored state is enough to serve clients before any daemon is up
+    load_snapshot()
+    event_queue = asyncio.Queue()
+    
     # Start HTTP server in background thread
     http_thread = Thread(target=run_http_server, daemon=True)
     http_thread.start()
     
+    # Start daemon processes (they'll emit events); they boot while we bind
+    daemon_tasks = await start_daemons()
+    
     # Start WebSocket server
     print(f"[WS] Starting WebSocket server on ws://localhost:{WEBSOCKET_PORT}")
     
-    async with websockets.serve(handle_client, "0.0.0.0", WEBSOCKET_PORT):
-        # Start daemon processes (they'll emit events)
-        daemon_tasks = await start_daemons()
+    # Keepalive is ours (see keepalive_loop), not a ping task per connection
+    async with websockets.serve(handle_client, "0.0.0.0", WEBSOCKET_PORT, ping_interval=None):
+        print(f"[STARTUP] Serving in {(time.monotonic() - started) * 1000:.0f} ms")
         
-        # Run event broadcaster concurrently with daemon readers
-        await asyncio.gather(
+        # Clients can connect from here on, so they need heartbeats (and
+        # daemon events need broadcasting) before every daemon is ready
+        running = asyncio.gather(
             event_broadcaster(),
-            *daemon_tasks,
-            asyncio.Future()  # Run forever
+            keepalive_loop(),
+            snapshot_loop(),
+            *daemon_tasks
         )
+        signalled = asyncio.create_task(stopping.wait())
+        
+        try:
+            await wait_for_daemons(STARTUP_TIMEOUT)
+            server_ready = True
+            for daemon_name in list(activity_subscribers):
+                send_to_daemon(daemon_name, {"type": "server_ready"})
+            print(f"[STARTUP] Daemons ready in {(time.monotonic() - started) * 1000:.0f} ms")
+            
+            await asyncio.wait([running, signalled], return_when=asyncio.FIRST_COMPLETED)
+            if running.done():
+                running.result()  # A task crashed; take the server down with it
+            print("\n[SHUTDOWN] Received interrupt, shutting down...")
+        finally:
+            running.cancel()
+            signalled.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+            await shutdown()
 
 
 if __name__ == "__main__":
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        print("\n[SHUTDOWN] Received interrupt, shutting down...")
+    asyncio.run(main())
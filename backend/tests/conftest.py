@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# Daemons and the server import their siblings as top-level modules
+# (they run as scripts)
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND / "daemons"))
+sys.path.insert(0, str(BACKEND / "server"))
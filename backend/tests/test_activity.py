@@ -0,0 +1,98 @@
+"""Tests for the activity aggregator's heavy-hitter windows."""
+
+import random
+from collections import Counter
+
+from activity import ActivityAggregator, SlidingWindowCounter, SpaceSaving
+
+
+def assert_consistent(summary: SpaceSaving):
+    """min_count and the count groups must agree with the per-key counts."""
+    assert len(summary.counts) <= summary.capacity
+    if summary.counts:
+        assert summary.min_count == min(summary.counts.values())
+    grouped = {key: count for count, keys in summary.by_count.items() for key in keys}
+    assert grouped == summary.counts
+    assert all(summary.by_count.values())
+
+
+def assert_totals_match_buckets(counter: SlidingWindowCounter):
+    expected = Counter()
+    for bucket in counter.buckets:
+        expected.update(bucket.counts)
+    assert counter.totals == +expected
+
+
+def test_space_saving_tracks_min_count():
+    summary = SpaceSaving(capacity=4)
+    rng = random.Random(26)
+    for _ in range(2000):
+        summary.add(f"f{int(rng.paretovariate(1.2))}")
+        assert_consistent(summary)
+
+
+def test_space_saving_eviction_inherits_the_minimum():
+    summary = SpaceSaving(capacity=2)
+    summary.add("a")
+    summary.add("a")
+    summary.add("b")
+
+    assert summary.add("c") == ("b", 1)
+    assert summary.counts == {"a": 2, "c": 2}
+    assert_consistent(summary)
+
+
+def test_heavy_hitter_survives_a_burst_of_one_offs():
+    summary = SpaceSaving(capacity=8)
+    for i in range(1000):
+        summary.add("busy.txt")
+        summary.add(f"once_{i}.txt")
+
+    assert "busy.txt" in summary.counts
+    assert summary.counts["busy.txt"] >= 1000
+
+
+def test_totals_equal_bucket_sums_after_evictions():
+    counter = SlidingWindowCounter(window=60, buckets=6, capacity=3)
+    rng = random.Random(27)
+    for step in range(3000):
+        counter.add(f"f{rng.randrange(12)}", now=step * 0.1)
+        assert_totals_match_buckets(counter)
+
+
+def test_counts_expire_with_the_window():
+    counter = SlidingWindowCounter(window=60, buckets=6)
+    counter.add("a.txt", now=0)
+    counter.add("a.txt", now=30)
+
+    assert counter.count("a.txt", now=59) == 2
+    assert counter.count("a.txt", now=65) == 1
+    assert counter.count("a.txt", now=95) == 0
+
+    # A long idle gap clears everything without walking every missed bucket
+    counter.add("b.txt", now=100)
+    assert counter.top(5, now=10_000) == []
+    assert_totals_match_buckets(counter)
+
+
+def test_top_files_and_topics():
+    aggregator = ActivityAggregator()
+    for _ in range(3):
+        aggregator.record({"type": "file_opened", "filename": "specimen_47_notes.txt"})
+    aggregator.record({"type": "file_modified", "path": "/home/mira/Desktop/grant_proposal.docx"})
+
+    assert aggregator.top_files("5m", 1) == [("specimen_47_notes.txt", 3)]
+    assert aggregator.topic_count("specimen 47") == 3
+    assert aggregator.topic_count("grant documentation") == 1
+
+
+def test_ignores_daemon_changes_and_malformed_events():
+    aggregator = ActivityAggregator()
+    aggregator.record({"type": "file_renamed", "new_path": "/x/a.txt", "cause": "daemon_chaos"})
+    aggregator.record({"type": "file_opened", "filename": 123})
+    aggregator.record({"type": "file_opened", "filename": ["a"]})
+    aggregator.record({"type": "file_created", "path": "/x/dir", "is_directory": True})
+    aggregator.record({"type": "chaos_notification", "path": "/x/a.txt"})
+
+    assert aggregator.top_files("1d") == []
+    assert aggregator.top_topics("1d") == []
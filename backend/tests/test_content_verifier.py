@@ -0,0 +1,119 @@
+"""Tests for the watcher's content verification stage."""
+
+import os
+import threading
+
+import pytest
+
+from daemon_watcher import ContentVerifier
+
+
+class Held:
+    """Keeps the verifier's single hash worker busy until released."""
+
+    def __init__(self, verifier):
+        self.verifier = verifier
+        self.release = threading.Event()
+        verifier.pool.submit(self.release.wait)
+
+    def drain(self):
+        self.release.set()
+        self.verifier.pool.submit(lambda: None).result()
+
+
+@pytest.fixture
+def verifier():
+    verifier = ContentVerifier(workers=1)
+    yield verifier
+    verifier.pool.shutdown(wait=True)
+
+
+def check(verifier, path):
+    """Run a check to completion; return the (old, new) hashes it reported."""
+    changes = []
+    verifier.check(str(path), lambda old, new: changes.append((old, new)))
+    verifier.pool.submit(lambda: None).result()
+    return changes
+
+
+def test_write_racing_a_queued_prime_is_reported(tmp_path, verifier):
+    path = tmp_path / "new.txt"
+    path.write_text("")
+
+    # Created, then written before the prime gets a worker
+    held = Held(verifier)
+    verifier.prime(str(path))
+    path.write_text("first real content")
+    changes = []
+    verifier.check(str(path), lambda old, new: changes.append((old, new)))
+    held.drain()
+
+    assert len(changes) == 1
+    old_hash, new_hash = changes[0]
+    assert old_hash is None and new_hash is not None
+    assert verifier.pending == {}
+
+
+def test_startup_priming_stops_at_the_read_budget(tmp_path, verifier, monkeypatch, capsys):
+    monkeypatch.setattr("daemon_watcher.PRIME_MAX_BYTES", 250)
+    for name in ("a", "b", "c"):
+        (tmp_path / name).write_bytes(b"x" * 100)
+
+    verifier.prime_existing([str(tmp_path)]).join()
+
+    assert len(verifier.cache) == 2
+    assert "read budget spent" in capsys.readouterr().out
+
+
+@pytest.fixture
+def primed(tmp_path, verifier):
+    path = tmp_path / "notes.txt"
+    path.write_text("original")
+    verifier.prime(str(path))
+    verifier.pool.submit(lambda: None).result()
+    return path
+
+
+def bump_mtime(path):
+    """Move mtime well past the cached one, so only the hash can tell."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+def test_touch_is_suppressed(primed, verifier):
+    bump_mtime(primed)
+    assert check(verifier, primed) == []
+    assert verifier.suppressed == 1
+
+
+def test_identical_rewrite_is_suppressed(primed, verifier):
+    primed.write_text("original")
+    bump_mtime(primed)
+    assert check(verifier, primed) == []
+    assert verifier.suppressed == 1
+
+
+def test_real_change_carries_both_hashes(primed, verifier):
+    old_hash = verifier.cache[str(primed)][3]
+    primed.write_text("edited")
+
+    changes = check(verifier, primed)
+    assert len(changes) == 1
+    assert changes[0][0] == old_hash
+    assert changes[0][1] not in (None, old_hash)
+
+    # The new content is now the baseline
+    primed.write_text("edited")
+    bump_mtime(primed)
+    assert check(verifier, primed) == []
+
+
+def test_create_then_write_is_reported(tmp_path, verifier):
+    path = tmp_path / "fresh.txt"
+    path.write_text("")
+    verifier.prime(str(path))
+    verifier.pool.submit(lambda: None).result()
+
+    path.write_text("first content")
+    changes = check(verifier, path)
+    assert len(changes) == 1 and changes[0][1] is not None
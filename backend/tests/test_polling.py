@@ -0,0 +1,131 @@
+"""Tests for the scandir polling observer's snapshot diffing."""
+
+import os
+import shutil
+
+import pytest
+
+from polling import ScandirPollingObserver
+
+
+class RecordingHandler:
+    """Collects dispatched events as (type, src, dest) tuples."""
+
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        dest = getattr(event, "dest_path", "") or None
+        self.events.append((event.event_type, event.src_path, dest))
+
+    def take(self, include_dirs_modified: bool = False):
+        events, self.events = self.events, []
+        return [
+            e for e in events
+            if include_dirs_modified or not (e[0] == "modified" and os.path.isdir(e[1]))
+        ]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a" / "sub").mkdir(parents=True)
+    (tmp_path / "a" / "f1").write_text("one")
+    (tmp_path / "a" / "sub" / "inner").write_text("inner")
+    return tmp_path
+
+
+@pytest.fixture
+def watch(tree):
+    observer = ScandirPollingObserver(priority_paths=[str(tree / "a")])
+    handler = RecordingHandler()
+    observer.schedule(handler, str(tree))
+
+    def poll():
+        observer.poll()
+        return handler.take()
+
+    return poll
+
+
+def test_no_changes_no_events(watch):
+    assert watch() == []
+
+
+def test_create_and_delete(tree, watch):
+    (tree / "a" / "new").write_text("x")
+    assert watch() == [("created", str(tree / "a" / "new"), None)]
+
+    (tree / "a" / "new").unlink()
+    assert watch() == [("deleted", str(tree / "a" / "new"), None)]
+
+
+def test_cross_directory_rename(tree, watch):
+    os.rename(tree / "a" / "f1", tree / "a" / "sub" / "moved")
+    assert watch() == [("moved", str(tree / "a" / "f1"), str(tree / "a" / "sub" / "moved"))]
+
+
+def test_directory_rename_moves_children(tree, watch):
+    os.rename(tree / "a" / "sub", tree / "a" / "sub2")
+    assert watch() == [
+        ("moved", str(tree / "a" / "sub"), str(tree / "a" / "sub2")),
+        ("moved", str(tree / "a" / "sub" / "inner"), str(tree / "a" / "sub2" / "inner")),
+    ]
+
+    # The snapshot follows the move
+    (tree / "a" / "sub2" / "inner").write_text("changed content")
+    assert watch() == [("modified", str(tree / "a" / "sub2" / "inner"), None)]
+
+
+def test_replace_in_place_is_a_modification(tree, watch):
+    (tree / "a" / "tmp").write_text("replacement")
+    os.rename(tree / "a" / "tmp", tree / "a" / "f1")
+    assert watch() == [("modified", str(tree / "a" / "f1"), None)]
+
+
+def test_swap_is_two_renames(tree, watch):
+    (tree / "a" / "f2").write_text("two")
+    watch()
+
+    os.rename(tree / "a" / "f1", tree / "a" / "tmp")
+    os.rename(tree / "a" / "f2", tree / "a" / "f1")
+    os.rename(tree / "a" / "tmp", tree / "a" / "f2")
+    assert sorted(watch()) == [
+        ("moved", str(tree / "a" / "f1"), str(tree / "a" / "f2")),
+        ("moved", str(tree / "a" / "f2"), str(tree / "a" / "f1")),
+    ]
+
+
+def test_rmtree_deletes_children_first(tree, watch):
+    shutil.rmtree(tree / "a" / "sub")
+    assert watch() == [
+        ("deleted", str(tree / "a" / "sub" / "inner"), None),
+        ("deleted", str(tree / "a" / "sub"), None),
+    ]
+
+
+def test_new_directory_contents_are_created(tree, watch):
+    (tree / "a" / "fresh" / "deep").mkdir(parents=True)
+    (tree / "a" / "fresh" / "deep" / "file").write_text("x")
+    assert sorted(watch()) == [
+        ("created", str(tree / "a" / "fresh"), None),
+        ("created", str(tree / "a" / "fresh" / "deep"), None),
+        ("created", str(tree / "a" / "fresh" / "deep" / "file"), None),
+    ]
+
+
+def test_content_edit_of_priority_file_seen_next_poll(tree, watch):
+    (tree / "a" / "f1").write_text("edited, and longer")
+    assert watch() == [("modified", str(tree / "a" / "f1"), None)]
+
+
+def test_content_edit_of_recent_file_seen_next_poll(tree, watch, monkeypatch):
+    import polling
+    monkeypatch.setattr(polling, "MIN_FILE_STATS_PER_POLL", 0)
+    monkeypatch.setattr(polling, "MODIFY_LAP", float("inf"))
+
+    (tree / "a" / "sub" / "recent").write_text("x")
+    watch()
+
+    # Not a priority directory and the sweep is empty: only "hot" finds it
+    (tree / "a" / "sub" / "recent").write_text("edited")
+    assert ("modified", str(tree / "a" / "sub" / "recent"), None) in watch()
@@ -0,0 +1,59 @@
+"""Tests for the keepalive timer wheel."""
+
+from main import TimerWheel
+
+
+def advance(wheel: TimerWheel, ticks: int) -> list:
+    """Advance `ticks` slots; return what fell due, tick by tick."""
+    return [wheel.advance() for _ in range(ticks)]
+
+
+def test_fires_after_delay():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 3)
+
+    assert advance(wheel, 3) == [set(), set(), {"a"}]
+    assert wheel.where == {}
+
+
+def test_rounds_delays_up_to_whole_ticks():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 0.1)
+    wheel.schedule("b", 1.5)
+
+    assert advance(wheel, 2) == [{"a"}, {"b"}]
+
+
+def test_cancel():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 2)
+    wheel.cancel("a")
+    wheel.cancel("never scheduled")
+
+    assert advance(wheel, 8) == [set()] * 8
+
+
+def test_reschedule_moves_the_item():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 2)
+    wheel.schedule("a", 5)
+
+    due = advance(wheel, 5)
+    assert due.index({"a"}) == 4
+    assert sum(len(items) for items in due) == 1
+
+
+def test_delays_are_capped_at_one_lap():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 1000)
+
+    # Capped one slot short of a lap, so it can't land on the current slot
+    assert advance(wheel, 7)[-1] == {"a"}
+
+
+def test_scheduling_is_relative_to_the_current_position():
+    wheel = TimerWheel(tick=1.0, slots=4)
+    advance(wheel, 3)
+    wheel.schedule("a", 2)
+
+    assert advance(wheel, 2) == [set(), {"a"}]
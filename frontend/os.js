@@ -72,6 +72,7 @@ let ws = null;
 let wsConnected = false;
 let wsReconnectAttempts = 0;
 const MAX_RECONNECT_ATTEMPTS = 5;
+const seenJournalEntries = new Set();  // Backend timestamps already shown
 
 function connectWebSocket() {
   if (ws && ws.readyState === WebSocket.OPEN) return;
@@ -168,7 +169,10 @@ function handleBackendEvent(event) {
       break;
       
     case 'journal_entry':
-      addJournalEntry(event.message);
+      // The backend replays recent entries on every (re)connect
+      if (seenJournalEntries.has(event.timestamp)) break;
+      seenJournalEntries.add(event.timestamp);
+      addJournalEntry(event.message, event.replayed ? new Date(event.timestamp) : undefined);
       break;
       
     default:
@@ -701,13 +705,12 @@ function generateTicketNumber() {
 // JOURNAL
 // ============================================
 
-function addJournalEntry(message) {
+function addJournalEntry(message, time = new Date()) {
   const container = document.getElementById('journal-entries');
   const entry = document.createElement('div');
   entry.className = 'journal-entry new';
   
-  const now = new Date();
-  const timeStr = now.toLocaleTimeString('en-US', { hour: 'numeric', minute: '2-digit' });
+  const timeStr = time.toLocaleTimeString('en-US', { hour: 'numeric', minute: '2-digit' });
   
   entry.innerHTML = `
     <span class="time">${timeStr}</span>
@@ -727,7 +730,7 @@ function addJournalEntry(message) {
     container.removeChild(container.lastChild);
   }
   
-  state.journalEntries.unshift({ message, time: now });
+  state.journalEntries.unshift({ message, time });
 }
 
 // ============================================